@@ -3,15 +3,32 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
+from functools import cached_property
+from html import escape
+from typing import Mapping
 
+import httpx
 import resend
+from resend.exceptions import ResendError
 
 from src.summarizer import DigestContent, ProductSummary
 
 
-@dataclass
+# Maximum number of emails Resend accepts in a single /emails/batch request
+BATCH_SIZE = 100
+
+# Retry policy for rate-limited (429) or failed (5xx) Resend requests
+MAX_SEND_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+
+@dataclass(slots=True, frozen=True)
 class Recipient:
     """Email recipient."""
 
@@ -19,40 +36,108 @@ class Recipient:
     email: str
 
 
-def generate_html_email(digest: DigestContent) -> str:
-    """Generate beautiful HTML email from digest content."""
-    products_html = ""
+class _PooledHTTPClient(resend.HTTPClient):
+    """Resend HTTP client that reuses keep-alive connections across requests."""
 
-    for i, product in enumerate(digest.products, 1):
-        topics_html = " • ".join(
-            f'<span style="color: #6b7280;">{topic}</span>' for topic in product.topics
-        ) if product.topics else ""
+    def __init__(self, max_connections: int = 4, timeout: int = 30):
+        self._client = httpx.Client(
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections),
+        )
 
-        products_html += f"""
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        json: dict | list | None = None,
+    ) -> tuple[bytes, int, Mapping[str, str]]:
+        try:
+            response = self._client.request(method, url, headers=headers, json=json)
+        except httpx.HTTPError as e:
+            # Matches the SDK's default client; Resend wraps it in a ResendError
+            raise RuntimeError(f"Request failed: {e}") from e
+        return response.content, response.status_code, response.headers
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class _RateLimiter:
+    """Thread-safe limiter spacing requests at least 1/`rate` seconds apart."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        # A single token means no bursts: requests go out evenly, 1/`rate` seconds apart
+        self._capacity = 1.0
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be made."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                # Waiting under the lock keeps queued senders in arrival order
+                time.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+
+def _is_retryable(error: ResendError) -> bool:
+    """Whether a Resend error is transient (rate limit or server/transport failure)."""
+    try:
+        code = int(error.code)
+    except (TypeError, ValueError):
+        return False
+    return code == 429 or code >= 500
+
+
+def _field(obj: object, name: str) -> object:
+    """Read a field from a Resend response item, which may be a dict or an object."""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _chunked(items: list[Recipient], size: int) -> list[list[Recipient]]:
+    """Split recipients into consecutive groups of at most `size`."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# Per-product block and page skeleton, built once at import and filled per digest
+_PRODUCT_TEMPLATE = """
         <div style="margin-bottom: 32px; padding: 24px; background-color: #ffffff; border-radius: 12px; border: 1px solid #e5e7eb;">
             <div style="display: flex; align-items: flex-start; gap: 16px;">
-                <img src="{product.image_url}" alt="{product.name}" style="width: 64px; height: 64px; border-radius: 12px; object-fit: cover;" />
+                <img src="{image_url}" alt="{name}" style="width: 64px; height: 64px; border-radius: 12px; object-fit: cover;" />
                 <div style="flex: 1;">
                     <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 4px;">
-                        <span style="font-size: 12px; font-weight: 600; color: #da552f; background-color: #fff5f3; padding: 2px 8px; border-radius: 4px;">#{i}</span>
-                        <a href="{product.url}" style="font-size: 18px; font-weight: 600; color: #1f2937; text-decoration: none;">{product.name}</a>
+                        <span style="font-size: 12px; font-weight: 600; color: #da552f; background-color: #fff5f3; padding: 2px 8px; border-radius: 4px;">#{rank}</span>
+                        <a href="{url}" style="font-size: 18px; font-weight: 600; color: #1f2937; text-decoration: none;">{name}</a>
                     </div>
-                    <p style="font-size: 14px; color: #6b7280; margin: 0 0 12px 0; font-style: italic;">"{product.original_tagline}"</p>
-                    <p style="font-size: 15px; color: #374151; margin: 0 0 12px 0; line-height: 1.6;">{product.summary}</p>
-                    {f'<p style="font-size: 14px; color: #059669; margin: 0 0 12px 0;"><strong>💡 Why it matters:</strong> {product.why_it_matters}</p>' if product.why_it_matters else ''}
+                    <p style="font-size: 14px; color: #6b7280; margin: 0 0 12px 0; font-style: italic;">"{tagline}"</p>
+                    <p style="font-size: 15px; color: #374151; margin: 0 0 12px 0; line-height: 1.6;">{summary}</p>
+                    {why_it_matters}
                     <div style="display: flex; align-items: center; gap: 16px; font-size: 13px;">
-                        <span style="color: #6b7280;">💬 {product.comments_count} comments</span>
-                        {f'<span>{topics_html}</span>' if topics_html else ''}
+                        <span style="color: #6b7280;">💬 {comments_count} comments</span>
+                        {topics}
                     </div>
-                    <a href="{product.url}" style="display: inline-block; margin-top: 12px; padding: 8px 16px; background-color: #da552f; color: #ffffff; text-decoration: none; border-radius: 6px; font-size: 14px; font-weight: 500;">View on Product Hunt →</a>
+                    <a href="{url}" style="display: inline-block; margin-top: 12px; padding: 8px 16px; background-color: #da552f; color: #ffffff; text-decoration: none; border-radius: 6px; font-size: 14px; font-weight: 500;">View on Product Hunt →</a>
                 </div>
             </div>
         </div>
         """
 
-    today = datetime.now().strftime("%B %d, %Y")
+_WHY_IT_MATTERS_TEMPLATE = '<p style="font-size: 14px; color: #059669; margin: 0 0 12px 0;"><strong>💡 Why it matters:</strong> {why_it_matters}</p>'
+
+_TOPIC_TEMPLATE = '<span style="color: #6b7280;">{topic}</span>'
 
-    html = f"""<!DOCTYPE html>
+_HTML_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
@@ -69,13 +154,13 @@ def generate_html_email(digest: DigestContent) -> str:
 
         <!-- Intro -->
         <div style="background: linear-gradient(135deg, #da552f 0%, #f97316 100%); padding: 24px; border-radius: 12px; margin-bottom: 32px;">
-            <p style="font-size: 16px; color: #ffffff; margin: 0; line-height: 1.6;">{digest.intro}</p>
+            <p style="font-size: 16px; color: #ffffff; margin: 0; line-height: 1.6;">{intro}</p>
         </div>
 
         <!-- Products -->
         <div style="margin-bottom: 32px;">
             <h2 style="font-size: 20px; font-weight: 600; color: #1f2937; margin: 0 0 20px 0;">Today's Top Launches</h2>
-            {products_html}
+            {products}
         </div>
 
         <!-- Footer -->
@@ -94,12 +179,46 @@ def generate_html_email(digest: DigestContent) -> str:
 </body>
 </html>"""
 
-    return html
+
+def generate_html_email(digest: DigestContent) -> str:
+    """Generate beautiful HTML email from digest content."""
+    product_parts: list[str] = []
+
+    for i, product in enumerate(digest.products, 1):
+        # Product Hunt and Gemini text is escaped once here; templates only receive safe markup
+        topics_html = " • ".join(
+            _TOPIC_TEMPLATE.format_map({"topic": escape(topic)}) for topic in product.topics
+        ) if product.topics else ""
+
+        product_parts.append(_PRODUCT_TEMPLATE.format_map({
+            "rank": i,
+            "name": escape(product.name),
+            "url": escape(product.url),
+            "image_url": escape(product.image_url),
+            "tagline": escape(product.original_tagline),
+            "summary": escape(product.summary),
+            "why_it_matters": (
+                _WHY_IT_MATTERS_TEMPLATE.format_map({"why_it_matters": escape(product.why_it_matters)})
+                if product.why_it_matters else ""
+            ),
+            "comments_count": product.comments_count,
+            "topics": f"<span>{topics_html}</span>" if topics_html else "",
+        }))
+
+    products_html = "".join(product_parts)
+
+    today = digest.generated_at.strftime("%B %d, %Y")
+
+    return _HTML_TEMPLATE.format_map({
+        "today": today,
+        "intro": escape(digest.intro),
+        "products": products_html,
+    })
 
 
 def generate_text_email(digest: DigestContent) -> str:
     """Generate plain text email from digest content."""
-    today = datetime.now().strftime("%B %d, %Y")
+    today = digest.generated_at.strftime("%B %d, %Y")
 
     lines = [
         "🚀 PRODUCT HUNT DAILY DIGEST",
@@ -144,14 +263,37 @@ def generate_text_email(digest: DigestContent) -> str:
     return "\n".join(lines)
 
 
+class RenderedDigest:
+    """Email bodies for a digest, rendered on first access and reused afterwards."""
+
+    def __init__(self, digest: DigestContent):
+        self.digest = digest
+
+    @cached_property
+    def html(self) -> str:
+        return generate_html_email(self.digest)
+
+    @cached_property
+    def text(self) -> str:
+        return generate_text_email(self.digest)
+
+
 class EmailSender:
     """Email sender using Resend API."""
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_workers: int = 4,
+        requests_per_second: float = 2,
+    ):
         self.api_key = api_key or os.getenv("RESEND_API_KEY")
         if not self.api_key:
             raise ValueError("RESEND_API_KEY is required. Set it in .env or pass it directly.")
 
+        self.max_workers = max(1, int(max_workers))
+        self._limiter = _RateLimiter(requests_per_second) if requests_per_second > 0 else None
+
         resend.api_key = self.api_key
 
     def send_digest(
@@ -160,41 +302,105 @@ class EmailSender:
         recipients: list[Recipient],
         from_email: str,
         subject_prefix: str = "🚀 Product Hunt Daily",
+        include_text: bool = True,
     ) -> list[dict]:
         """Send digest to all recipients."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        subject = f"{subject_prefix} - {today}"
+        subject = f"{subject_prefix} - {digest.generated_at.strftime('%Y-%m-%d')}"
+        rendered = RenderedDigest(digest)
+
+        # Everything but the recipient is identical across sends, so build it once
+        base_payload = {
+            "from": from_email,
+            "subject": subject,
+            "html": rendered.html,
+        }
+        if include_text:
+            base_payload["text"] = rendered.text
+
+        # Share keep-alive connections across batches, unless the caller installed their own client
+        pooled_client = None
+        previous_client = resend.default_http_client
+        if type(previous_client) is resend.RequestsClient:
+            pooled_client = _PooledHTTPClient(max_connections=self.max_workers)
+            resend.default_http_client = pooled_client
+
+        # Batches are independent network calls, so keep several in flight at once
+        chunks = _chunked(recipients, BATCH_SIZE)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                chunk_results = list(executor.map(lambda chunk: self._send_batch(chunk, base_payload), chunks))
+        finally:
+            if pooled_client:
+                resend.default_http_client = previous_client
+                pooled_client.close()
+
+        # Log after all batches finish so output stays in recipient order
+        results = []
+        for chunk, batch_results in zip(chunks, chunk_results):
+            for recipient, result in zip(chunk, batch_results):
+                if result["status"] == "sent":
+                    print(f"✅ Email sent to {recipient.name} <{recipient.email}>")
+                else:
+                    print(f"❌ Failed to send email to {recipient.name} <{recipient.email}>: {result['error']}")
+            results.extend(batch_results)
 
-        html_content = generate_html_email(digest)
-        text_content = generate_text_email(digest)
+        return results
 
+    def _send_batch(self, recipients: list[Recipient], base_payload: dict) -> list[dict]:
+        """Send one batch request and map its response back to per-recipient results."""
+        params = [{**base_payload, "to": [recipient.email]} for recipient in recipients]
+        options = {
+            # One key for every attempt, so a retried batch is never delivered twice
+            "idempotency_key": str(uuid.uuid4()),
+            # Reject only invalid emails rather than the whole batch
+            "batch_validation": "permissive",
+        }
+
+        try:
+            response = self._send_with_retry(params, options)
+        except Exception as e:
+            return [
+                {"recipient": recipient.email, "status": "failed", "error": str(e)}
+                for recipient in recipients
+            ]
+
+        sent = _field(response, "data") or []
+        errors = {_field(error, "index"): _field(error, "message") for error in _field(response, "errors") or []}
+
+        # `data` lists only accepted emails, in request order, skipping rejected indexes
+        accepted = iter(sent)
         results = []
-
-        for recipient in recipients:
-            try:
-                response = resend.Emails.send({
-                    "from": from_email,
-                    "to": [recipient.email],
-                    "subject": subject,
-                    "html": html_content,
-                    "text": text_content,
-                })
+        for i, recipient in enumerate(recipients):
+            if i in errors:
                 results.append({
                     "recipient": recipient.email,
-                    "status": "sent",
-                    "id": response.get("id") if isinstance(response, dict) else getattr(response, "id", None),
+                    "status": "failed",
+                    "error": str(errors[i] or "Rejected by Resend"),
                 })
-                print(f"✅ Email sent to {recipient.name} <{recipient.email}>")
-            except Exception as e:
+                continue
+            email_id = _field(next(accepted, None), "id")
+            if email_id:
+                results.append({"recipient": recipient.email, "status": "sent", "id": email_id})
+            else:
                 results.append({
                     "recipient": recipient.email,
                     "status": "failed",
-                    "error": str(e),
+                    "error": "No email id returned by Resend",
                 })
-                print(f"❌ Failed to send email to {recipient.name} <{recipient.email}>: {e}")
-
         return results
 
+    def _send_with_retry(self, params: list[dict], options: dict) -> dict:
+        """Call the batch endpoint, backing off exponentially on transient errors."""
+        for attempt in range(MAX_SEND_ATTEMPTS):
+            if self._limiter:
+                self._limiter.acquire()
+            try:
+                return resend.Batch.send(params, options)
+            except ResendError as e:
+                if attempt == MAX_SEND_ATTEMPTS - 1 or not _is_retryable(e):
+                    raise
+                time.sleep(min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY))
+
 
 def send_digest(
     digest: DigestContent,
@@ -202,7 +408,14 @@ def send_digest(
     from_email: str,
     subject_prefix: str = "🚀 Product Hunt Daily",
     api_key: str | None = None,
+    max_workers: int = 4,
+    requests_per_second: float = 2,
+    include_text: bool = True,
 ) -> list[dict]:
     """Convenience function to send digest emails."""
-    sender = EmailSender(api_key=api_key)
-    return sender.send_digest(digest, recipients, from_email, subject_prefix)
+    sender = EmailSender(
+        api_key=api_key,
+        max_workers=max_workers,
+        requests_per_second=requests_per_second,
+    )
+    return sender.send_digest(digest, recipients, from_email, subject_prefix, include_text=include_text)
@@ -14,6 +14,12 @@ from src.mailer import Recipient, send_digest
 from src.scraper import fetch_products
 from src.summarizer import summarize_products
 
+try:
+    # LibYAML bindings, when PyYAML was built with them
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 def load_config(config_path: str = "config.yaml") -> dict:
     """Load configuration from YAML file."""
@@ -22,14 +28,17 @@ def load_config(config_path: str = "config.yaml") -> dict:
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
 
     with open(path) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YamlLoader)
 
 
 def main() -> int:
     """Main entry point."""
+    # One timestamp for the whole run, so every email carries the same date
+    started_at = datetime.now()
+
     print("=" * 60)
     print("🚀 Product Hunt Daily Emailer")
-    print(f"   {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"   {started_at.strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     print()
 
@@ -50,6 +59,9 @@ def main() -> int:
     recipients_config = config.get("recipients", [])
 
     product_count = settings.get("product_count", 5)
+    send_concurrency = settings.get("send_concurrency", 4)
+    send_rps = settings.get("send_rps", 2)
+    send_text_alt = settings.get("send_text_alt", True)
     product_hunt_token = (
         os.getenv("PRODUCT_HUNT_TOKEN")
         or os.getenv("PH_ACCESS_TOKEN")
@@ -58,6 +70,7 @@ def main() -> int:
     from_email = email_config.get("from", "Product Hunt Digest <digest@example.com>")
     subject_prefix = email_config.get("subject_prefix", "🚀 Product Hunt Daily")
     model_name = gemini_config.get("model", "gemini-3-flash-preview")
+    summary_cache_path = gemini_config.get("cache_path", ".cache/summaries.sqlite")
 
     # Parse recipients
     recipients = [
@@ -99,7 +112,12 @@ def main() -> int:
     # Step 2: Generate summaries with Gemini
     print(f"🤖 Generating summaries with {model_name}...")
     try:
-        digest = summarize_products(products, model_name=model_name)
+        digest = summarize_products(
+            products,
+            model_name=model_name,
+            cache_path=summary_cache_path,
+            generated_at=started_at,
+        )
     except Exception as e:
         print(f"❌ Error generating summaries: {e}")
         return 1
@@ -115,6 +133,9 @@ def main() -> int:
             recipients=recipients,
             from_email=from_email,
             subject_prefix=subject_prefix,
+            max_workers=send_concurrency,
+            requests_per_second=send_rps,
+            include_text=send_text_alt,
         )
     except Exception as e:
         print(f"❌ Error sending emails: {e}")
@@ -33,7 +33,7 @@ GRAPHQL_QUERY = """query DailyTop($first: Int!, $after: DateTime!, $before: Date
 """
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Product:
     """Represents a Product Hunt product."""
 
@@ -105,12 +105,8 @@ class ProductHuntClient:
             "Content-Type": "application/json",
         }
 
-        response = httpx.post(
-            self.api_url,
-            json=payload,
-            headers=headers,
-            timeout=self.timeout,
-        )
+        with httpx.Client(http2=True, timeout=self.timeout) as client:
+            response = client.post(self.api_url, json=payload, headers=headers)
         response.raise_for_status()
 
         data = response.json()
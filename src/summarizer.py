@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
-from dataclasses import dataclass
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
 
+import orjson
 from google import genai
 from google.genai import types
 
@@ -46,7 +51,11 @@ Format your response as JSON with the following structure for each product:
 }"""
 
 
-@dataclass
+DEFAULT_INTRO = "Here are today's top Product Hunt launches!"
+FALLBACK_WHY_IT_MATTERS = "Check it out on Product Hunt!"
+
+
+@dataclass(slots=True, frozen=True)
 class ProductSummary:
     """Summarized product information."""
 
@@ -60,30 +69,210 @@ class ProductSummary:
     comments_count: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DigestContent:
     """Complete digest content."""
 
     intro: str
     products: list[ProductSummary]
+    generated_at: datetime = field(default_factory=datetime.now)
+
+
+def _as_text(value: object, default: str = "") -> str:
+    """Use a model-provided value only if it is a non-blank string (JSON null/numbers fall back)."""
+    return value if isinstance(value, str) and value.strip() else default
+
+
+def _normalize_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def _index_by_name(items: object) -> dict[str, dict]:
+    """Key Gemini's per-product entries by normalized name; the first entry for a name wins."""
+    entries: dict[str, dict] = {}
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, dict) and isinstance(item.get("name"), str):
+            entries.setdefault(_normalize_name(item["name"]), item)
+    return entries
+
+
+class SummaryCache:
+    """SQLite-backed cache of product summaries and digest intros, keyed by the model inputs."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS summaries ("
+                    "key TEXT PRIMARY KEY, summary TEXT NOT NULL, why_it_matters TEXT NOT NULL)"
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS intros (key TEXT PRIMARY KEY, intro TEXT NOT NULL)"
+                )
+        except sqlite3.Error:
+            self._conn.close()
+            raise
+
+    @staticmethod
+    def key(product: Product, model_name: str) -> str:
+        """Hash everything that goes into a product's prompt."""
+        raw = json.dumps(
+            [model_name, product.name, product.tagline, product.description, list(product.topics)]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def digest_key(product_keys: list[str]) -> str:
+        """Hash the ordered product keys, identifying the exact set an intro was written for."""
+        return hashlib.sha256("\n".join(product_keys).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> tuple[str, str] | None:
+        row = self._conn.execute(
+            "SELECT summary, why_it_matters FROM summaries WHERE key = ?", (key,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put_many(self, entries: list[tuple[str, str, str]]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO summaries (key, summary, why_it_matters) VALUES (?, ?, ?)",
+                entries,
+            )
+
+    def get_intro(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT intro FROM intros WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put_intro(self, key: str, intro: str) -> None:
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO intros (key, intro) VALUES (?, ?)", (key, intro))
+
+    def close(self) -> None:
+        self._conn.close()
 
 
 class GeminiSummarizer:
     """Summarizer using Gemini AI."""
 
-    def __init__(self, api_key: str | None = None, model_name: str = "gemini-3-flash-preview"):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model_name: str = "gemini-3-flash-preview",
+        cache: SummaryCache | None = None,
+    ):
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY is required. Set it in .env or pass it directly.")
 
         self.client = genai.Client(api_key=self.api_key)
         self.model_name = model_name
+        self.cache = cache
 
-    def summarize_products(self, products: list[Product]) -> DigestContent:
+    def summarize_products(
+        self,
+        products: list[Product],
+        generated_at: datetime | None = None,
+    ) -> DigestContent:
         """Generate summaries for a list of products."""
+        generated_at = generated_at or datetime.now()
         if not products:
-            return DigestContent(intro="No products found today.", products=[])
+            return DigestContent(intro="No products found today.", products=[], generated_at=generated_at)
+
+        # Reuse summaries from earlier runs and only ask Gemini about the rest
+        keys = [SummaryCache.key(p, self.model_name) for p in products] if self.cache else []
+        intro_key = SummaryCache.digest_key(keys) if keys else None
+        cached: dict[int, tuple[str, str]] = {}
+        cached_intro = None
+        try:
+            for i, key in enumerate(keys):
+                hit = self.cache.get(key)
+                if hit:
+                    cached[i] = hit
+            if intro_key:
+                cached_intro = self.cache.get_intro(intro_key)
+        except sqlite3.Error as e:
+            # A broken or locked cache must never block the digest
+            print(f"⚠️  Summary cache unreadable, summarizing without it: {e}")
+            keys, intro_key, cached, cached_intro = [], None, {}, None
+        misses = [p for i, p in enumerate(products) if i not in cached]
+        summarized = [p for i, p in enumerate(products) if i in cached]
+
+        # The intro covers the whole digest, so Gemini still runs when only the intro is missing
+        if misses or cached_intro is None:
+            result = self._generate(misses, summarized)
+        else:
+            result = {}
+        items = result.get("products") if result else None
+        items = items if isinstance(items, list) else []
+        generated = _index_by_name(items)
+        # Position is only trusted when the reply has exactly one entry per product asked about
+        by_position = len(items) == len(misses)
+        miss_names = {_normalize_name(p.name) for p in misses}
+        miss_positions = {i: j for j, i in enumerate(i for i in range(len(products)) if i not in cached)}
+
+        # Build ProductSummary objects
+        summaries: list[ProductSummary] = []
+        new_entries: list[tuple[str, str, str]] = []
+        for i, product in enumerate(products):
+            if i in cached:
+                summary, why_it_matters = cached[i]
+            elif result is None:
+                # Gemini's reply wasn't usable; only the uncached products fall back
+                summary, why_it_matters = product.tagline, FALLBACK_WHY_IT_MATTERS
+            else:
+                # Match replies by name first, so one skipped product can't shift the rest
+                summary_data = generated.get(_normalize_name(product.name))
+                matched_by_name = summary_data is not None
+                if not matched_by_name and by_position:
+                    candidate = items[miss_positions[i]]
+                    # Only a renamed entry qualifies, never one that belongs to another product
+                    if isinstance(candidate, dict) and _normalize_name(_as_text(candidate.get("name"))) not in miss_names:
+                        summary_data = candidate
+                        print(f"⚠️  Gemini renamed {product.name}; matched its summary by position")
+                if summary_data is None:
+                    print(f"⚠️  Gemini returned no summary for {product.name}; using its tagline")
+                    summary, why_it_matters = product.tagline, ""
+                else:
+                    summary = _as_text(summary_data.get("summary"), product.tagline)
+                    why_it_matters = _as_text(summary_data.get("why_it_matters"))
+                    # Positional matches are a best guess for this run only, so they aren't cached
+                    if keys and matched_by_name and _as_text(summary_data.get("summary")):
+                        new_entries.append((keys[i], summary, why_it_matters))
+            summaries.append(
+                ProductSummary(
+                    name=product.name,
+                    original_tagline=product.tagline,
+                    summary=summary,
+                    why_it_matters=why_it_matters,
+                    url=product.url,
+                    image_url=product.image_url,
+                    topics=product.topics,
+                    comments_count=product.comments_count,
+                )
+            )
+
+        generated_intro = _as_text(result.get("intro")) if result else ""
+        intro = generated_intro or cached_intro or DEFAULT_INTRO
+
+        try:
+            if new_entries:
+                self.cache.put_many(new_entries)
+            if intro_key and generated_intro:
+                self.cache.put_intro(intro_key, generated_intro)
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not save summaries to cache: {e}")
+
+        return DigestContent(intro=intro, products=summaries, generated_at=generated_at)
 
+    def _generate(self, products: list[Product], summarized: list[Product]) -> dict | None:
+        """Ask Gemini to summarize products; returns None unless the response is a JSON object.
+
+        `summarized` are the digest's already-summarized products, listed only so the
+        intro covers the whole digest.
+        """
         # Build the prompt with product information
         product_info = "\n\n".join(
             f"Product {i + 1}:\n"
@@ -94,14 +283,28 @@ class GeminiSummarizer:
             for i, p in enumerate(products)
         )
 
-        prompt = f"""Please summarize these {len(products)} Product Hunt launches for today's digest:
+        if products:
+            request = f"""Please summarize these {len(products)} Product Hunt launches for today's digest:
+
+{product_info}"""
+        else:
+            request = 'All of today\'s launches are already summarized, so return an empty "products" list.'
+
+        if summarized:
+            summarized_info = "\n".join(f"- {p.name}: {p.tagline}" for p in summarized)
+            also = " also" if products else ""
+            request += f"""
+
+Today's digest{also} includes these launches, which are already summarized. Do not summarize them, but cover them in the intro:
 
-{product_info}
+{summarized_info}"""
 
-Remember to provide a JSON response with summaries for each product and a brief intro."""
+        prompt = f"""{request}
 
-        # Generate content
-        response = self.client.models.generate_content(
+Remember to provide a JSON response with summaries for each product and a brief intro covering every launch in today's digest."""
+
+        # Stream the response so chunks are collected while generation continues
+        stream = self.client.models.generate_content_stream(
             model=self.model_name,
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -110,61 +313,34 @@ Remember to provide a JSON response with summaries for each product and a brief
                 temperature=0.7,
             ),
         )
+        text = "".join(chunk.text or "" for chunk in stream)
 
         # Parse the JSON response
         try:
-            result = json.loads(response.text)
-        except json.JSONDecodeError:
-            # Fallback if JSON parsing fails
-            return self._create_fallback_digest(products)
-
-        # Build ProductSummary objects
-        summaries: list[ProductSummary] = []
-        for i, product in enumerate(products):
-            summary_data = result.get("products", [])[i] if i < len(result.get("products", [])) else {}
-            summaries.append(
-                ProductSummary(
-                    name=product.name,
-                    original_tagline=product.tagline,
-                    summary=summary_data.get("summary", product.tagline),
-                    why_it_matters=summary_data.get("why_it_matters", ""),
-                    url=product.url,
-                    image_url=product.image_url,
-                    topics=product.topics,
-                    comments_count=product.comments_count,
-                )
-            )
-
-        intro = result.get("intro", "Here are today's top Product Hunt launches!")
-
-        return DigestContent(intro=intro, products=summaries)
-
-    def _create_fallback_digest(self, products: list[Product]) -> DigestContent:
-        """Create a fallback digest if AI summarization fails."""
-        summaries = [
-            ProductSummary(
-                name=p.name,
-                original_tagline=p.tagline,
-                summary=p.tagline,
-                why_it_matters="Check it out on Product Hunt!",
-                url=p.url,
-                image_url=p.image_url,
-                topics=p.topics,
-                comments_count=p.comments_count,
-            )
-            for p in products
-        ]
-        return DigestContent(
-            intro="Here are today's top Product Hunt launches!",
-            products=summaries,
-        )
+            result = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            return None
+        return result if isinstance(result, dict) else None
 
 
 def summarize_products(
     products: list[Product],
     api_key: str | None = None,
     model_name: str = "gemini-3-flash-preview",
+    cache_path: str | None = None,
+    generated_at: datetime | None = None,
 ) -> DigestContent:
     """Convenience function to summarize products."""
-    summarizer = GeminiSummarizer(api_key=api_key, model_name=model_name)
-    return summarizer.summarize_products(products)
+    cache = None
+    if cache_path:
+        try:
+            cache = SummaryCache(cache_path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️  Summary cache disabled ({cache_path}): {e}")
+
+    try:
+        summarizer = GeminiSummarizer(api_key=api_key, model_name=model_name, cache=cache)
+        return summarizer.summarize_products(products, generated_at=generated_at)
+    finally:
+        if cache:
+            cache.close()